@@ -691,7 +691,11 @@ def _cached_async_http_client(provider: str | None, timeout: int = 600, connect:
 
 @cache
 def _cached_async_http_transport() -> httpx.AsyncHTTPTransport:
-    return httpx.AsyncHTTPTransport()
+    # Multiple requests to the same provider host should reuse warm connections rather than paying a new TCP and TLS
+    # handshake each time, so keep more idle connections around for longer than httpx's defaults (20 and 5s).
+    return httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(max_connections=128, max_keepalive_connections=64, keepalive_expiry=60),
+    )
 
 
 DataT = TypeVar('DataT', str, bytes)
@@ -1,6 +1,7 @@
 from __future__ import annotations as _annotations
 
 import base64
+import re
 from collections.abc import AsyncIterator, Sequence
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
@@ -32,6 +33,7 @@ from ..messages import (
     ThinkingPart,
     ToolCallPart,
     ToolReturnPart,
+    UserContent,
     UserPromptPart,
     VideoUrl,
 )
@@ -110,6 +112,9 @@ class GeminiModel(Model):
     _auth: AuthProtocol | None = field(repr=False)
     _url: str | None = field(repr=False)
     _system: str = field(default='gemini', repr=False)
+    _generate_url: str = field(repr=False)
+    _stream_generate_url: str = field(repr=False)
+    _headers: dict[str, str] = field(repr=False)
 
     def __init__(
         self,
@@ -131,6 +136,9 @@ class GeminiModel(Model):
         """
         self._model_name = model_name
         self._provider = provider
+        self._generate_url = f'/{model_name}:generateContent'
+        self._stream_generate_url = f'/{model_name}:streamGenerateContent'
+        self._headers = {'Content-Type': 'application/json', 'User-Agent': get_user_agent()}
 
         if isinstance(provider, str):
             provider = infer_provider(provider)
@@ -155,8 +163,7 @@ class GeminiModel(Model):
         async with self._make_request(
             messages, False, cast(GeminiModelSettings, model_settings or {}), model_request_parameters
         ) as http_response:
-            data = await http_response.aread()
-            response = _gemini_response_ta.validate_json(data)
+            response = _gemini_response_ta.validate_json(await http_response.aread())
         return self._process_response(response)
 
     @asynccontextmanager
@@ -239,15 +246,14 @@ class GeminiModel(Model):
             if self._system == 'google-vertex':
                 request_data['labels'] = gemini_labels  # pragma: lax no cover
 
-        headers = {'Content-Type': 'application/json', 'User-Agent': get_user_agent()}
-        url = f'/{self._model_name}:{"streamGenerateContent" if streamed else "generateContent"}'
+        url = self._stream_generate_url if streamed else self._generate_url
 
         request_json = _gemini_request_ta.dump_json(request_data, by_alias=True)
         async with self.client.stream(
             'POST',
             url,
             content=request_json,
-            headers=headers,
+            headers=self._headers,
             timeout=model_settings.get('timeout', USE_CLIENT_DEFAULT),
         ) as r:
             if (status_code := r.status_code) != 200:
@@ -289,25 +295,24 @@ class GeminiModel(Model):
     async def _process_streamed_response(self, http_response: HTTPResponse) -> StreamedResponse:
         """Process a streamed response, and prepare a streaming response to return."""
         aiter_bytes = http_response.aiter_bytes()
-        start_response: _GeminiResponse | None = None
-        content = bytearray()
+        parser = _GeminiStreamParser()
+        responses: list[_GeminiResponse] = []
 
         async for chunk in aiter_bytes:
-            content.extend(chunk)
-            responses = _gemini_streamed_response_ta.validate_json(
-                _ensure_decodeable(content),
-                experimental_allow_partial='trailing-strings',
-            )
-            if responses:  # pragma: no branch
-                last = responses[-1]
-                if last['candidates'] and last['candidates'][0].get('content', {}).get('parts'):
-                    start_response = last
-                    break
-
-        if start_response is None:
+            new_responses = parser.feed(chunk)
+            responses.extend(new_responses)
+            # complete responses are only parsed once, so it's just the incomplete one being received that is re-parsed
+            if any(_has_content_parts(r) for r in new_responses):
+                break
+            partial_response = parser.partial_response()
+            if partial_response is not None and _has_content_parts(partial_response):
+                break
+        else:
             raise UnexpectedModelBehavior('Streamed response ended without content or tool calls')
 
-        return GeminiStreamedResponse(_model_name=self._model_name, _content=content, _stream=aiter_bytes)
+        return GeminiStreamedResponse(
+            _model_name=self._model_name, _responses=responses, _parser=parser, _stream=aiter_bytes
+        )
 
     async def _message_to_gemini_content(
         self, messages: list[ModelMessage]
@@ -322,15 +327,23 @@ class GeminiModel(Model):
                     if isinstance(part, SystemPromptPart):
                         sys_prompt_parts.append(_GeminiTextPart(text=part.content))
                     elif isinstance(part, UserPromptPart):
-                        message_parts.extend(await self._map_user_prompt(part))
+                        if isinstance(part.content, str):
+                            message_parts.append(_GeminiTextPart(text=part.content))
+                        else:
+                            message_parts.extend(await self._map_user_content(part.content))
                     elif isinstance(part, ToolReturnPart):
-                        message_parts.append(_response_part_from_response(part.tool_name, part.model_response_object()))
+                        function_response = _GeminiFunctionResponse(
+                            name=part.tool_name, response=part.model_response_object()
+                        )
+                        message_parts.append(_GeminiFunctionResponsePart(function_response=function_response))
                     elif isinstance(part, RetryPromptPart):
                         if part.tool_name is None:
                             message_parts.append(_GeminiTextPart(text=part.model_response()))  # pragma: no cover
                         else:
-                            response = {'call_error': part.model_response()}
-                            message_parts.append(_response_part_from_response(part.tool_name, response))
+                            function_response = _GeminiFunctionResponse(
+                                name=part.tool_name, response={'call_error': part.model_response()}
+                            )
+                            message_parts.append(_GeminiFunctionResponsePart(function_response=function_response))
                     else:
                         assert_never(part)
 
@@ -344,34 +357,31 @@ class GeminiModel(Model):
             sys_prompt_parts.insert(0, _GeminiTextPart(text=instructions))
         return sys_prompt_parts, contents
 
-    async def _map_user_prompt(self, part: UserPromptPart) -> list[_GeminiPartUnion]:
-        if isinstance(part.content, str):
-            return [{'text': part.content}]
-        else:
-            content: list[_GeminiPartUnion] = []
-            for item in part.content:
-                if isinstance(item, str):
-                    content.append({'text': item})
-                elif isinstance(item, BinaryContent):
-                    base64_encoded = base64.b64encode(item.data).decode('utf-8')
-                    content.append(
-                        _GeminiInlineDataPart(inline_data={'data': base64_encoded, 'mime_type': item.media_type})
+    async def _map_user_content(self, user_content: Sequence[UserContent]) -> list[_GeminiPartUnion]:
+        content: list[_GeminiPartUnion] = []
+        for item in user_content:
+            if isinstance(item, str):
+                content.append({'text': item})
+            elif isinstance(item, BinaryContent):
+                base64_encoded = base64.b64encode(item.data).decode('utf-8')
+                content.append(
+                    _GeminiInlineDataPart(inline_data={'data': base64_encoded, 'mime_type': item.media_type})
+                )
+            elif isinstance(item, VideoUrl) and item.is_youtube:
+                file_data = _GeminiFileDataPart(file_data={'file_uri': item.url, 'mime_type': item.media_type})
+                content.append(file_data)
+            elif isinstance(item, FileUrl):
+                if self.system == 'google-gla' or item.force_download:
+                    downloaded_item = await download_item(item, data_format='base64')
+                    inline_data = _GeminiInlineDataPart(
+                        inline_data={'data': downloaded_item['data'], 'mime_type': downloaded_item['data_type']}
                     )
-                elif isinstance(item, VideoUrl) and item.is_youtube:
+                    content.append(inline_data)
+                else:  # pragma: lax no cover
                     file_data = _GeminiFileDataPart(file_data={'file_uri': item.url, 'mime_type': item.media_type})
                     content.append(file_data)
-                elif isinstance(item, FileUrl):
-                    if self.system == 'google-gla' or item.force_download:
-                        downloaded_item = await download_item(item, data_format='base64')
-                        inline_data = _GeminiInlineDataPart(
-                            inline_data={'data': downloaded_item['data'], 'mime_type': downloaded_item['data_type']}
-                        )
-                        content.append(inline_data)
-                    else:  # pragma: lax no cover
-                        file_data = _GeminiFileDataPart(file_data={'file_uri': item.url, 'mime_type': item.media_type})
-                        content.append(file_data)
-                else:
-                    assert_never(item)  # pragma: lax no cover
+            else:
+                assert_never(item)  # pragma: lax no cover
         return content
 
     def _map_response_schema(self, o: OutputObjectDefinition) -> dict[str, Any]:
@@ -425,12 +435,17 @@ class GeminiStreamedResponse(StreamedResponse):
     """Implementation of `StreamedResponse` for the Gemini model."""
 
     _model_name: GeminiModelName
-    _content: bytearray
+    _responses: list[_GeminiResponse]
+    """Responses already parsed while waiting for the stream to produce content."""
+    _parser: _GeminiStreamParser
     _stream: AsyncIterator[bytes]
     _timestamp: datetime = field(default_factory=_utils.now_utc, init=False)
 
     async def _get_event_iterator(self) -> AsyncIterator[ModelResponseStreamEvent]:
         async for gemini_response in self._get_gemini_responses():
+            # usage metadata is cumulative, and may be omitted until the last response
+            if 'usage_metadata' in gemini_response:
+                self._usage = _metadata_as_usage(gemini_response)
             candidate = gemini_response['candidates'][0]
             if 'content' not in candidate:
                 raise UnexpectedModelBehavior('Streamed response has no content field')  # pragma: no cover
@@ -458,39 +473,24 @@ class GeminiStreamedResponse(StreamedResponse):
                     )
                     if maybe_event is not None:  # pragma: no branch
                         yield maybe_event
-                else:
-                    if not any([key in gemini_part for key in ['function_response', 'thought']]):
-                        raise AssertionError(f'Unexpected part: {gemini_part}')  # pragma: no cover
+                elif 'function_response' not in gemini_part and 'thought' not in gemini_part:
+                    raise AssertionError(f'Unexpected part: {gemini_part}')  # pragma: no cover
 
     async def _get_gemini_responses(self) -> AsyncIterator[_GeminiResponse]:
         # This method exists to ensure we only yield completed items, so we don't need to worry about
-        # partial gemini responses, which would make everything more complicated
+        # partial gemini responses, which would make everything more complicated.
+        # Each response is validated once, as soon as its closing brace arrives, so the total parsing work is linear
+        # in the size of the stream rather than re-validating the whole buffer on every chunk.
+        for r in self._responses:
+            yield r
 
-        gemini_responses: list[_GeminiResponse] = []
-        current_gemini_response_index = 0
-        # Right now, there are some circumstances where we will have information that could be yielded sooner than it is
-        # But changing that would make things a lot more complicated.
         async for chunk in self._stream:
-            self._content.extend(chunk)
-
-            gemini_responses = _gemini_streamed_response_ta.validate_json(
-                _ensure_decodeable(self._content),
-                experimental_allow_partial='trailing-strings',
-            )
-
-            # The idea: yield only up to the latest response, which might still be partial.
-            # Note that if the latest response is complete, we could yield it immediately, but there's not a good
-            # allow_partial API to determine if the last item in the list is complete.
-            responses_to_yield = gemini_responses[:-1]
-            for r in responses_to_yield[current_gemini_response_index:]:
-                current_gemini_response_index += 1
+            for r in self._parser.feed(chunk):
                 yield r
 
-        # Now yield the final response, which should be complete
-        if gemini_responses:  # pragma: no branch
-            r = gemini_responses[-1]
-            self._usage = _metadata_as_usage(r)
-            yield r
+        # if the stream was cut off part way through a response, still yield as much of it as was received
+        if (partial_response := self._parser.partial_response()) is not None:
+            yield partial_response
 
     @property
     def model_name(self) -> GeminiModelName:
@@ -601,7 +601,8 @@ def _content_model_response(m: ModelResponse) -> _GeminiContent:
     parts: list[_GeminiPartUnion] = []
     for item in m.parts:
         if isinstance(item, ToolCallPart):
-            parts.append(_function_call_part_from_call(item))
+            function_call = _GeminiFunctionCall(name=item.tool_name, args=item.args_as_dict())
+            parts.append(_GeminiFunctionCallPart(function_call=function_call))
         elif isinstance(item, ThinkingPart):
             # NOTE: We don't send ThinkingPart to the providers yet. If you are unsatisfied with this,
             # please open an issue. The below code is the code to send thinking to the provider.
@@ -655,10 +656,6 @@ class _GeminiFunctionCallPart(_BasePart):
     function_call: Annotated[_GeminiFunctionCall, pydantic.Field(alias='functionCall')]
 
 
-def _function_call_part_from_call(tool: ToolCallPart) -> _GeminiFunctionCallPart:
-    return _GeminiFunctionCallPart(function_call=_GeminiFunctionCall(name=tool.tool_name, args=tool.args_as_dict()))
-
-
 def _process_response_from_parts(
     parts: Sequence[_GeminiPartUnion],
     model_name: GeminiModelName,
@@ -697,10 +694,6 @@ class _GeminiFunctionResponsePart(TypedDict):
     function_response: Annotated[_GeminiFunctionResponse, pydantic.Field(alias='functionResponse')]
 
 
-def _response_part_from_response(name: str, response: dict[str, Any]) -> _GeminiFunctionResponsePart:
-    return _GeminiFunctionResponsePart(function_response=_GeminiFunctionResponse(name=name, response=response))
-
-
 class _GeminiFunctionResponse(TypedDict):
     """See <https://ai.google.dev/api/caching#FunctionResponse>."""
 
@@ -727,7 +720,6 @@ def _part_discriminator(v: Any) -> str:
 
 # See <https://ai.google.dev/api/caching#Part>
 # we don't currently support other part types
-# TODO discriminator
 _GeminiPartUnion = Annotated[
     Union[
         Annotated[_GeminiTextPart, pydantic.Tag('text')],
@@ -905,8 +897,12 @@ _gemini_response_ta = pydantic.TypeAdapter(_GeminiResponse)
 _gemini_streamed_response_ta = pydantic.TypeAdapter(list[_GeminiResponse], config=pydantic.ConfigDict(defer_build=True))
 
 
-def _ensure_decodeable(content: bytearray) -> bytearray:
-    """Trim any invalid unicode point bytes off the end of a bytearray.
+def _has_content_parts(response: _GeminiResponse) -> bool:
+    return bool(response['candidates'] and response['candidates'][0].get('content', {}).get('parts'))
+
+
+def _ensure_decodeable(content: bytes) -> bytes:
+    """Trim any invalid unicode point bytes off the end of a bytes object.
 
     This is necessary before attempting to parse streaming JSON bytes.
 
@@ -919,3 +915,92 @@ def _ensure_decodeable(content: bytearray) -> bytearray:
         return content[: e.start]
     else:
         return content
+
+
+# bytes that change the JSON nesting state outside of strings, and those that matter inside strings
+_JSON_STRUCTURAL_RE = re.compile(rb'[{}\[\]"]')
+_JSON_STRING_SPECIAL_RE = re.compile(rb'["\\]')
+
+
+@dataclass
+class _GeminiStreamParser:
+    """Incrementally split a streamed JSON array of Gemini responses into validated responses.
+
+    Each chunk is scanned once to find the boundaries of each top-level array item, and each complete item is
+    validated exactly once. Items contained in a single chunk are sliced straight out of it; only items spanning
+    several chunks are joined, once they are complete.
+
+    Since the boundaries are always ASCII structural characters, complete items never end in a partial
+    multi-byte unicode sequence.
+    """
+
+    _pending: list[bytes] = field(default_factory=list, init=False)
+    """Bytes received so far for the current top-level item, when it started in an earlier chunk."""
+    _depth: int = field(default=0, init=False)
+    _in_string: bool = field(default=False, init=False)
+    _escaped: bool = field(default=False, init=False)
+    """Whether the previous chunk ended with the backslash of a string escape."""
+
+    def feed(self, chunk: bytes) -> list[_GeminiResponse]:
+        """Add a chunk of the stream and return any responses completed by it."""
+        responses: list[_GeminiResponse] = []
+        if not chunk:
+            return responses
+        length = len(chunk)
+        # offset of the start of the current item, if it started in this chunk
+        item_start: int | None = None
+        position = 0
+        if self._escaped:
+            self._escaped = False
+            position = 1
+        while True:
+            if self._in_string:
+                match = _JSON_STRING_SPECIAL_RE.search(chunk, position)
+                if match is None:
+                    break
+                position = match.end()
+                if match[0] == b'\\':
+                    if position == length:
+                        # the escaped byte is at the start of the next chunk
+                        self._escaped = True
+                        break
+                    position += 1
+                else:
+                    self._in_string = False
+            else:
+                match = _JSON_STRUCTURAL_RE.search(chunk, position)
+                if match is None:
+                    break
+                position = match.end()
+                char = match[0]
+                if char == b'"':
+                    self._in_string = True
+                elif char in (b'{', b'['):
+                    if self._depth == 1:
+                        item_start = match.start()
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 1:
+                        if item_start is None:
+                            self._pending.append(chunk[:position])
+                            item = b''.join(self._pending)
+                            self._pending = []
+                        else:
+                            item = chunk[item_start:position]
+                            item_start = None
+                        responses.append(_gemini_response_ta.validate_json(item))
+
+        if self._depth >= 2:
+            self._pending.append(chunk if item_start is None else chunk[item_start:])
+        return responses
+
+    def partial_response(self) -> _GeminiResponse | None:
+        """Partially validate the response currently being received, if there is one."""
+        if self._depth < 2:
+            return None
+        partial = _gemini_streamed_response_ta.validate_json(
+            _ensure_decodeable(b''.join([b'[', *self._pending])),
+            experimental_allow_partial='trailing-strings',
+        )
+        return partial[0] if partial else None
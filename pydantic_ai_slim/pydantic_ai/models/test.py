@@ -1,6 +1,5 @@
 from __future__ import annotations as _annotations
 
-import re
 import string
 from collections.abc import AsyncIterator, Iterable
 from contextlib import asynccontextmanager
@@ -327,7 +326,7 @@ class _JsonSchemaTestData:
         elif examples := schema.get('examples'):
             return examples[self.seed % len(examples)]
         elif ref := schema.get('$ref'):
-            key = re.sub(r'^#/\$defs/', '', ref)
+            key = ref.removeprefix('#/$defs/')
             js_def = self.defs[key]
             return self._gen_any(js_def)
         elif any_of := schema.get('anyOf'):
@@ -1,8 +1,7 @@
 from __future__ import annotations as _annotations
 
-import re
 from abc import ABC, abstractmethod
-from copy import deepcopy
+from collections.abc import Generator
 from dataclasses import dataclass
 from typing import Any, Literal
 
@@ -10,6 +9,9 @@ from pydantic_ai.exceptions import UserError
 
 JsonSchema = dict[str, Any]
 
+_HandleSteps = Generator[JsonSchema, JsonSchema, JsonSchema]
+"""A step of handling a schema, which yields nested schemas to be handled and is sent the handled results."""
+
 
 @dataclass(init=False)
 class JsonSchemaTransformer(ABC):
@@ -45,7 +47,7 @@ class JsonSchemaTransformer(ABC):
         return schema
 
     def walk(self) -> JsonSchema:
-        schema = deepcopy(self.schema)
+        schema = _copy_json(self.schema)
 
         # First, handle everything but $defs:
         schema.pop('$defs', None)
@@ -60,7 +62,7 @@ class JsonSchemaTransformer(ABC):
             # we modify it to avoid collisions.
             defs = {key: self.defs[key] for key in self.recursive_refs}
             root_ref = self.schema.get('$ref')
-            root_key = None if root_ref is None else re.sub(r'^#/\$defs/', '', root_ref)
+            root_key = None if root_ref is None else root_ref.removeprefix('#/$defs/')
             if root_key is None:
                 root_key = self.schema.get('title', 'root')
                 while root_key in defs:
@@ -73,10 +75,31 @@ class JsonSchemaTransformer(ABC):
         return handled
 
     def _handle(self, schema: JsonSchema) -> JsonSchema:
+        """Handle a schema and all the schemas nested in it.
+
+        Each step yields the nested schemas it needs handled and is sent back the result, so nesting is tracked with an
+        explicit stack rather than by recursion, and deeply nested schemas can't hit the recursion limit.
+        """
+        stack = [self._handle_schema(schema)]
+        handled: JsonSchema | None = None
+        while True:
+            step = stack[-1]
+            try:
+                nested = next(step) if handled is None else step.send(handled)
+            except StopIteration as e:
+                stack.pop()
+                if not stack:
+                    return e.value
+                handled = e.value
+            else:
+                stack.append(self._handle_schema(nested))
+                handled = None
+
+    def _handle_schema(self, schema: JsonSchema) -> _HandleSteps:
         nested_refs = 0
         if self.prefer_inlined_defs:
             while ref := schema.get('$ref'):
-                key = re.sub(r'^#/\$defs/', '', ref)
+                key = ref.removeprefix('#/$defs/')
                 if key in self.refs_stack:
                     self.recursive_refs.add(key)
                     break  # recursive ref can't be unpacked
@@ -91,12 +114,12 @@ class JsonSchemaTransformer(ABC):
         # Handle the schema based on its type / structure
         type_ = schema.get('type')
         if type_ == 'object':
-            schema = self._handle_object(schema)
+            schema = yield from self._handle_object(schema)
         elif type_ == 'array':
-            schema = self._handle_array(schema)
+            schema = yield from self._handle_array(schema)
         elif type_ is None:
-            schema = self._handle_union(schema, 'anyOf')
-            schema = self._handle_union(schema, 'oneOf')
+            schema = yield from self._handle_union(schema, 'anyOf')
+            schema = yield from self._handle_union(schema, 'oneOf')
 
         # Apply the base transform
         schema = self.transform(schema)
@@ -106,43 +129,48 @@ class JsonSchemaTransformer(ABC):
 
         return schema
 
-    def _handle_object(self, schema: JsonSchema) -> JsonSchema:
+    def _handle_object(self, schema: JsonSchema) -> _HandleSteps:
         if properties := schema.get('properties'):
             handled_properties = {}
             for key, value in properties.items():
-                handled_properties[key] = self._handle(value)
+                handled_properties[key] = yield value
             schema['properties'] = handled_properties
 
         if (additional_properties := schema.get('additionalProperties')) is not None:
             if isinstance(additional_properties, bool):
                 schema['additionalProperties'] = additional_properties
             else:
-                schema['additionalProperties'] = self._handle(additional_properties)
+                schema['additionalProperties'] = yield additional_properties
 
         if (pattern_properties := schema.get('patternProperties')) is not None:
             handled_pattern_properties = {}
             for key, value in pattern_properties.items():
-                handled_pattern_properties[key] = self._handle(value)
+                handled_pattern_properties[key] = yield value
             schema['patternProperties'] = handled_pattern_properties
 
         return schema
 
-    def _handle_array(self, schema: JsonSchema) -> JsonSchema:
+    def _handle_array(self, schema: JsonSchema) -> _HandleSteps:
         if prefix_items := schema.get('prefixItems'):
-            schema['prefixItems'] = [self._handle(item) for item in prefix_items]
+            handled_prefix_items: list[JsonSchema] = []
+            for item in prefix_items:
+                handled_prefix_items.append((yield item))
+            schema['prefixItems'] = handled_prefix_items
 
         if items := schema.get('items'):
-            schema['items'] = self._handle(items)
+            schema['items'] = yield items
 
         return schema
 
-    def _handle_union(self, schema: JsonSchema, union_kind: Literal['anyOf', 'oneOf']) -> JsonSchema:
+    def _handle_union(self, schema: JsonSchema, union_kind: Literal['anyOf', 'oneOf']) -> _HandleSteps:
         try:
             members = schema.pop(union_kind)
         except KeyError:
             return schema
 
-        handled = [self._handle(member) for member in members]
+        handled: list[JsonSchema] = []
+        for member in members:
+            handled.append((yield member))
 
         # convert nullable unions to nullable types
         if self.simplify_nullable_unions:
@@ -168,7 +196,7 @@ class JsonSchemaTransformer(ABC):
             )
             if non_null_schema:
                 # Create a new schema based on the non-null part, mark as nullable
-                new_schema = deepcopy(non_null_schema)
+                new_schema = _copy_json(non_null_schema)
                 new_schema['nullable'] = True
                 return [new_schema]
             else:  # pragma: no cover
@@ -178,6 +206,31 @@ class JsonSchemaTransformer(ABC):
         return cases
 
 
+def _copy_json(value: dict[str, Any]) -> dict[str, Any]:
+    """Copy the dicts and lists of a JSON object, sharing the (immutable) leaves with the original.
+
+    This is all the transformers need, and is much cheaper than `copy.deepcopy`,
+    which dispatches on the type of every object and keeps a memo of everything it has copied.
+    Containers are copied with an explicit stack rather than by recursion, so deeply nested schemas can't hit the
+    recursion limit.
+    """
+    root = dict(value)
+    stack: list[dict[Any, Any] | list[Any]] = [root]
+    while stack:
+        container = stack.pop()
+        # replacing the values of existing keys is safe while iterating
+        for key, item in container.items() if isinstance(container, dict) else enumerate(container):
+            if isinstance(item, dict):
+                copied: dict[Any, Any] | list[Any] = dict(item)  # pyright: ignore[reportUnknownArgumentType]
+            elif isinstance(item, list):
+                copied = list(item)  # pyright: ignore[reportUnknownArgumentType]
+            else:
+                continue
+            container[key] = copied
+            stack.append(copied)
+    return root
+
+
 class InlineDefsJsonSchemaTransformer(JsonSchemaTransformer):
     """Transforms the JSON Schema to inline $defs."""
 
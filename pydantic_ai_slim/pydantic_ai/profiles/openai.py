@@ -1,6 +1,5 @@
 from __future__ import annotations as _annotations
 
-import re
 from dataclasses import dataclass
 from typing import Any
 
@@ -98,7 +97,7 @@ class OpenAIJsonSchemaTransformer(JsonSchemaTransformer):
         # Because the following should never change the semantics of the schema we apply it unconditionally.
         if self.root_ref is not None:
             result.pop('$ref', None)  # We replace references to the self.root_ref with just '#' in the transform method
-            root_key = re.sub(r'^#/\$defs/', '', self.root_ref)
+            root_key = self.root_ref.removeprefix('#/$defs/')
             result.update(self.defs.get(root_key) or {})
 
         return result
@@ -8,7 +8,7 @@ from collections.abc import AsyncIterator, Callable, Sequence
 from dataclasses import dataclass
 from datetime import timezone
 from enum import IntEnum
-from typing import Annotated
+from typing import Annotated, Any
 
 import httpx
 import pytest
@@ -48,6 +48,7 @@ from pydantic_ai.models.gemini import (
     _GeminiFunctionCallPart,
     _GeminiResponse,
     _GeminiSafetyRating,
+    _GeminiStreamParser,
     _GeminiTextPart,
     _GeminiThoughtPart,
     _GeminiToolConfig,
@@ -55,6 +56,7 @@ from pydantic_ai.models.gemini import (
     _GeminiUsageMetaData,
 )
 from pydantic_ai.output import NativeOutput, PromptedOutput, TextOutput, ToolOutput
+from pydantic_ai.profiles.google import GoogleJsonSchemaTransformer
 from pydantic_ai.providers.google_gla import GoogleGLAProvider
 from pydantic_ai.result import Usage
 from pydantic_ai.tools import ToolDefinition
@@ -542,6 +544,25 @@ async def test_json_def_date(allow_model_requests: None):
     )
 
 
+def test_json_schema_deeply_nested():
+    # nested object schemas, deeper than the recursion limit
+    json_schema: dict[str, Any] = {'type': 'object', 'title': 'Level'}
+    nested = json_schema
+    for _ in range(3000):
+        nested['properties'] = {'child': {'type': 'object', 'title': 'Level'}}
+        nested = nested['properties']['child']
+
+    transformed = GoogleJsonSchemaTransformer(json_schema).walk()
+    assert json_schema['title'] == 'Level'
+
+    # every level is transformed
+    level = transformed
+    for _ in range(3000):
+        assert level.keys() == {'type', 'properties'}
+        level = level['properties']['child']
+    assert level == {'type': 'object'}
+
+
 @dataclass
 class AsyncByteStreamList(httpx.AsyncByteStream):
     data: list[bytes]
@@ -829,6 +850,49 @@ async def test_stream_text(get_gemini_client: GetGeminiClient):
     assert result.usage() == snapshot(Usage(requests=1, request_tokens=1, response_tokens=2, total_tokens=3))
 
 
+async def test_stream_usage_not_in_every_response(get_gemini_client: GetGeminiClient):
+    first_response = gemini_response(_content_model_response(ModelResponse(parts=[TextPart('Hello ')])))
+    del first_response['usage_metadata']
+    last_response = gemini_response(_content_model_response(ModelResponse(parts=[TextPart('!')])))
+    del last_response['usage_metadata']
+    responses = [
+        first_response,
+        gemini_response(_content_model_response(ModelResponse(parts=[TextPart('world')]))),
+        # a response without usage metadata mustn't reset the usage reported by an earlier one
+        last_response,
+    ]
+    json_data = _gemini_streamed_response_ta.dump_json(responses, by_alias=True)
+    stream = AsyncByteStreamList([json_data[:100], json_data[100:200], json_data[200:]])
+    gemini_client = get_gemini_client(stream)
+    m = GeminiModel('gemini-1.5-flash', provider=GoogleGLAProvider(http_client=gemini_client))
+    agent = Agent(m)
+
+    async with agent.run_stream('Hello') as result:
+        assert await result.get_output() == 'Hello world!'
+    assert result.usage() == snapshot(Usage(requests=1, request_tokens=1, response_tokens=2, total_tokens=3))
+
+
+@pytest.mark.parametrize(
+    'texts,output',
+    [
+        pytest.param(['Hello ', 'world'], 'Hello world', id='last-response'),
+        pytest.param(['Hello '], 'Hello ', id='only-response'),
+    ],
+)
+async def test_stream_truncated(get_gemini_client: GetGeminiClient, texts: list[str], output: str):
+    responses = [gemini_response(_content_model_response(ModelResponse(parts=[TextPart(text)]))) for text in texts]
+    json_data = _gemini_streamed_response_ta.dump_json(responses, by_alias=True)
+    # the stream ends part way through the last response, after its content has been received
+    stream = AsyncByteStreamList([json_data[:100], json_data[100:-30]])
+    gemini_client = get_gemini_client(stream)
+    m = GeminiModel('gemini-1.5-flash', provider=GoogleGLAProvider(http_client=gemini_client))
+    agent = Agent(m)
+
+    async with agent.run_stream('Hello') as result:
+        assert await result.get_output() == output
+    assert result.usage() == snapshot(Usage(requests=1, request_tokens=1, response_tokens=2, total_tokens=3))
+
+
 async def test_stream_invalid_unicode_text(get_gemini_client: GetGeminiClient):
     # Probably safe to remove this test once https://github.com/pydantic/pydantic-core/issues/1633 is resolved
     responses = [
@@ -861,6 +925,49 @@ async def test_stream_invalid_unicode_text(get_gemini_client: GetGeminiClient):
     assert result.usage() == snapshot(Usage(requests=1, request_tokens=1, response_tokens=2, total_tokens=3))
 
 
+async def test_stream_invalid_unicode_text_in_partial_response(get_gemini_client: GetGeminiClient):
+    # Probably safe to remove this test once https://github.com/pydantic/pydantic-core/issues/1633 is resolved
+    responses = [
+        gemini_response(_content_model_response(ModelResponse(parts=[TextPart('abc€')]))),
+        gemini_response(_content_model_response(ModelResponse(parts=[TextPart('def')]))),
+    ]
+    json_data = _gemini_streamed_response_ta.dump_json(responses, by_alias=True)
+
+    # split inside the first response, so it has to be trimmed before it can be partially parsed
+    split = json_data.index('€'.encode()) + 1
+    parts = [json_data[:split], json_data[split:]]
+    with pytest.raises(UnicodeDecodeError):
+        parts[0].decode()
+
+    stream = AsyncByteStreamList(parts)
+    gemini_client = get_gemini_client(stream)
+    m = GeminiModel('gemini-1.5-flash', provider=GoogleGLAProvider(http_client=gemini_client))
+    agent = Agent(m)
+
+    async with agent.run_stream('Hello') as result:
+        chunks = [chunk async for chunk in result.stream(debounce_by=None)]
+        assert chunks == snapshot(['abc€', 'abc€def', 'abc€def'])
+    assert result.usage() == snapshot(Usage(requests=1, request_tokens=1, response_tokens=2, total_tokens=3))
+
+
+def test_stream_parser_chunk_boundaries():
+    responses = [
+        gemini_response(_content_model_response(ModelResponse(parts=[TextPart('say "hi" \\ [{')]))),
+        gemini_response(_content_model_response(ModelResponse(parts=[TextPart('€}]')]))),
+    ]
+    json_data = _gemini_streamed_response_ta.dump_json(responses, by_alias=True)
+
+    parser = _GeminiStreamParser()
+    parsed: list[_GeminiResponse] = []
+    for i in range(len(json_data)):
+        parsed.extend(parser.feed(json_data[i : i + 1]))
+        # empty chunks must not disturb the parser state, e.g. a pending string escape
+        assert parser.feed(b'') == []
+    assert parsed == responses
+
+    assert _GeminiStreamParser().feed(json_data) == responses
+
+
 async def test_stream_text_no_data(get_gemini_client: GetGeminiClient):
     responses = [_GeminiResponse(candidates=[], usage_metadata=example_usage())]
     json_data = _gemini_streamed_response_ta.dump_json(responses, by_alias=True)
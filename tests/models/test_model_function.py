@@ -1,7 +1,5 @@
 import json
-import re
 from collections.abc import AsyncIterator
-from dataclasses import asdict
 from datetime import timezone
 
 import pydantic_core
@@ -51,22 +49,21 @@ def test_init() -> None:
 
 async def return_last(messages: list[ModelMessage], _: AgentInfo) -> ModelResponse:
     last = messages[-1].parts[-1]
-    response = asdict(last)
-    response.pop('timestamp', None)
-    response['message_count'] = len(messages)
-    return ModelResponse(parts=[TextPart(' '.join(f'{k}={v!r}' for k, v in response.items()))])
+    part_json = pydantic_core.to_json(last, exclude={'timestamp'}).decode()
+    # add the message count to the end of the serialized part
+    return ModelResponse(parts=[TextPart(f'{part_json[:-1]},"message_count":{len(messages)}}}')])
 
 
 def test_simple():
     agent = Agent(FunctionModel(return_last))
     result = agent.run_sync('Hello')
-    assert result.output == snapshot("content='Hello' part_kind='user-prompt' message_count=1")
+    assert result.output == snapshot('{"content":"Hello","part_kind":"user-prompt","message_count":1}')
     assert result.all_messages() == snapshot(
         [
             ModelRequest(parts=[UserPromptPart(content='Hello', timestamp=IsNow(tz=timezone.utc))]),
             ModelResponse(
-                parts=[TextPart(content="content='Hello' part_kind='user-prompt' message_count=1")],
-                usage=Usage(requests=1, request_tokens=51, response_tokens=3, total_tokens=54),
+                parts=[TextPart(content='{"content":"Hello","part_kind":"user-prompt","message_count":1}')],
+                usage=Usage(requests=1, request_tokens=51, response_tokens=7, total_tokens=58),
                 model_name='function:return_last:',
                 timestamp=IsNow(tz=timezone.utc),
             ),
@@ -74,20 +71,20 @@ def test_simple():
     )
 
     result2 = agent.run_sync('World', message_history=result.all_messages())
-    assert result2.output == snapshot("content='World' part_kind='user-prompt' message_count=3")
+    assert result2.output == snapshot('{"content":"World","part_kind":"user-prompt","message_count":3}')
     assert result2.all_messages() == snapshot(
         [
             ModelRequest(parts=[UserPromptPart(content='Hello', timestamp=IsNow(tz=timezone.utc))]),
             ModelResponse(
-                parts=[TextPart(content="content='Hello' part_kind='user-prompt' message_count=1")],
-                usage=Usage(requests=1, request_tokens=51, response_tokens=3, total_tokens=54),
+                parts=[TextPart(content='{"content":"Hello","part_kind":"user-prompt","message_count":1}')],
+                usage=Usage(requests=1, request_tokens=51, response_tokens=7, total_tokens=58),
                 model_name='function:return_last:',
                 timestamp=IsNow(tz=timezone.utc),
             ),
             ModelRequest(parts=[UserPromptPart(content='World', timestamp=IsNow(tz=timezone.utc))]),
             ModelResponse(
-                parts=[TextPart(content="content='World' part_kind='user-prompt' message_count=3")],
-                usage=Usage(requests=1, request_tokens=52, response_tokens=6, total_tokens=58),
+                parts=[TextPart(content='{"content":"World","part_kind":"user-prompt","message_count":3}')],
+                usage=Usage(requests=1, request_tokens=52, response_tokens=14, total_tokens=66),
                 model_name='function:return_last:',
                 timestamp=IsNow(tz=timezone.utc),
             ),
@@ -97,7 +94,9 @@ def test_simple():
 
 async def weather_model(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:  # pragma: lax no cover
     assert info.allow_text_output
-    assert {t.name for t in info.function_tools} == {'get_location', 'get_weather'}
+    function_tools = info.function_tools
+    assert len(function_tools) == 2
+    assert function_tools[0].name == 'get_location' and function_tools[1].name == 'get_weather'
     last = messages[-1].parts[-1]
     if isinstance(last, UserPromptPart):
         return ModelResponse(parts=[ToolCallPart('get_location', json.dumps({'location_description': last.content}))])
@@ -105,21 +104,10 @@ async def weather_model(messages: list[ModelMessage], info: AgentInfo) -> ModelR
         if last.tool_name == 'get_location':
             return ModelResponse(parts=[ToolCallPart('get_weather', last.model_response_str())])
         elif last.tool_name == 'get_weather':
-            location_name: str | None = None
-            for m in messages:
-                location_name = next(
-                    (
-                        item
-                        for item in (part.content for part in m.parts if isinstance(part, UserPromptPart))
-                        if isinstance(item, str)
-                    ),
-                    None,
-                )
-                if location_name is not None:
-                    break
-
-            assert location_name is not None
-            return ModelResponse(parts=[TextPart(f'{last.content} in {location_name}')])
+            # the user prompt always comes last in the first request, after any system prompts
+            user_prompt = messages[0].parts[-1]
+            assert isinstance(user_prompt, UserPromptPart) and isinstance(user_prompt.content, str)
+            return ModelResponse(parts=[TextPart(f'{last.content} in {user_prompt.content}')])
 
     raise ValueError(f'Unexpected message: {last}')
 
@@ -133,7 +121,7 @@ async def get_location(location_description: str) -> str:
         lat_lng = {'lat': 51, 'lng': 0}
     else:
         lat_lng = {'lat': 0, 'lng': 0}
-    return json.dumps(lat_lng)
+    return pydantic_core.to_json(lat_lng).decode()
 
 
 @weather_agent.tool
@@ -165,14 +153,14 @@ def test_weather():
                 parts=[
                     ToolReturnPart(
                         tool_name='get_location',
-                        content='{"lat": 51, "lng": 0}',
+                        content='{"lat":51,"lng":0}',
                         timestamp=IsNow(tz=timezone.utc),
                         tool_call_id=IsStr(),
                     )
                 ]
             ),
             ModelResponse(
-                parts=[ToolCallPart(tool_name='get_weather', args='{"lat": 51, "lng": 0}', tool_call_id=IsStr())],
+                parts=[ToolCallPart(tool_name='get_weather', args='{"lat":51,"lng":0}', tool_call_id=IsStr())],
                 usage=Usage(requests=1, request_tokens=56, response_tokens=11, total_tokens=67),
                 model_name='function:weather_model:',
                 timestamp=IsNow(tz=timezone.utc),
@@ -204,7 +192,7 @@ async def call_function_model(messages: list[ModelMessage], _: AgentInfo) -> Mod
     last = messages[-1].parts[-1]
     if isinstance(last, UserPromptPart):
         if isinstance(last.content, str) and last.content.startswith('{'):
-            details = json.loads(last.content)
+            details = pydantic_core.from_json(last.content)
             return ModelResponse(parts=[ToolCallPart(details['function'], json.dumps(details['arguments']))])
     elif isinstance(last, ToolReturnPart):
         return ModelResponse(parts=[TextPart(pydantic_core.to_json(last).decode())])
@@ -218,14 +206,16 @@ var_args_agent = Agent(FunctionModel(call_function_model), deps_type=int)
 @var_args_agent.tool
 def get_var_args(ctx: RunContext[int], *args: int):
     assert ctx.deps == 123
-    return json.dumps({'args': args})
+    # args are validated as ints, so they can be formatted without going through json
+    return f'{{"args": [{", ".join(map(str, args))}]}}'
 
 
 def test_var_args():
     result = var_args_agent.run_sync('{"function": "get_var_args", "arguments": {"args": [1, 2, 3]}}', deps=123)
-    response_data = json.loads(result.output)
+    response_data = pydantic_core.from_json(result.output)
     # Can't parse ISO timestamps with trailing 'Z' in older versions of python:
-    response_data['timestamp'] = re.sub('Z$', '+00:00', response_data['timestamp'])
+    timestamp = response_data['timestamp']
+    response_data['timestamp'] = timestamp[:-1] + '+00:00' if timestamp.endswith('Z') else timestamp
     assert response_data == snapshot(
         {
             'tool_name': 'get_var_args',
@@ -285,7 +275,7 @@ def test_deps_init():
 def test_model_arg():
     agent = Agent()
     result = agent.run_sync('Hello', model=FunctionModel(return_last))
-    assert result.output == snapshot("content='Hello' part_kind='user-prompt' message_count=1")
+    assert result.output == snapshot('{"content":"Hello","part_kind":"user-prompt","message_count":1}')
 
     with pytest.raises(RuntimeError, match='`model` must either be set on the agent or included when calling it.'):
         agent.run_sync('Hello')